@@ -9,7 +9,7 @@ from mauzr.serializer import Serializer, Struct, Topic, String
 __author__ = "Alexander Sowitzki"
 
 
-class Agent:
+class Agent:  # pylint: disable=too-many-instance-attributes
     """ Base class for all mauzr agents.
 
     An agent has a single responsibility and works with other agents in
@@ -19,6 +19,9 @@ class Agent:
     and the name of the agent.
     """
 
+    MAX_BLOCKING = 2
+    """ Maximum amount of blocking calls per agent on the worker pools. """
+
     def __init__(self, shell, name):
         self.shell, self.name, self.sched = shell, name, shell.sched
 
@@ -42,6 +45,7 @@ class Agent:
         self.__missing_inputs = set()
         self.__cfg_subs = {}
         self.__stack = ExitStack()
+        self.__blocking = 0  # Blocking calls queued or running.
 
         self.active = False  # Indicates if agent is active.
 
@@ -123,6 +127,50 @@ class Agent:
         #return _guard
         return cb
 
+    def blocking(self, cb, done=None, process=False):
+        """ Wrap a blocking callable so it runs on a worker pool of the shell.
+
+        The scheduler thread continues while the callable runs. Calls are
+        dropped while MAX_BLOCKING calls of this agent are pending.
+
+        Args:
+            cb (callable): Blocking callable. Must be picklable if process is \
+                           set.
+            done (callable): Receives the result of the callable in the \
+                             scheduler thread if the agent is still active.
+            process (bool): Use the process pool instead of the thread pool.
+        Returns:
+            callable: Wrapper that submits calls to the pool.
+        """
+
+        def _submit(*args, **kwargs):
+            if self.__blocking >= self.MAX_BLOCKING:
+                self.log.warning("Dropping call to %s, too many pending", cb)
+                return
+            self.__blocking += 1
+            future = self.shell.executor(process).submit(cb, *args, **kwargs)
+            # Future callback runs in the worker, pass result back.
+            future.add_done_callback(lambda f: self.sched.call_soon(
+                self.__on_blocking_done, f, done))
+        return _submit
+
+    def __on_blocking_done(self, future, done):
+        """ Handle the result of a blocking call in the scheduler thread.
+
+        Args:
+            future (concurrent.futures.Future): Future of the call.
+            done (callable): Callable that receives the result.
+        """
+
+        self.__blocking -= 1
+        try:
+            result = future.result()
+        except Exception:  # pylint: disable=broad-except
+            self.log.exception("Blocking call failed")
+            return
+        if done is not None and self.active:
+            done(result)
+
     def __add_missing_input(self, handle):
         """ Register a setup topic to be required for the agent to function.
 
@@ -262,7 +310,7 @@ class Agent:
             self.__rm_missing_input(handle)
 
     def input_topic(self, name, regex, desc, ser=None,
-                    cb=None, restart=True, sub=None):
+                    cb=None, restart=True, sub=None, blocking=False):
         """ Setup a dynamic input topic.
 
         Args:
@@ -274,6 +322,7 @@ class Agent:
             cb (callable): Callable that receives messages.
             restart (bool): Restart agent if output changes.
             sub (dict): Arguments passed to mauzr.mqtt.Handle.sub.
+            blocking (bool): Run the callable on the worker pool.
         """
 
         cfg_ser = Topic(self.shell, desc)
@@ -298,7 +347,7 @@ class Agent:
             if restart:
                 self.update_agent(restart=True)
 
-            self.static_input(handle, cb, sub)
+            self.static_input(handle, cb, sub, blocking)
 
             # Got message on topic, not missing anymore.
             self.__rm_missing_input(cfg_handle)
@@ -307,18 +356,21 @@ class Agent:
         guarded_cb = self.guard_error(_source_cb)
         self.__cfg_subs[name] = cfg_handle.sub(guarded_cb)
 
-    def static_input(self, handle, cb, sub=None):
+    def static_input(self, handle, cb, sub=None, blocking=False):
         """ Setup a static input.
 
         Args:
             handle (mauzr.mqtt.Handle): Handle to use for input.
             cb (callable): Callback that receives messages.
             sub (dict): Arguments passed to mauzr.mqtt.Handle.sub.
+            blocking (bool): Run the callback on the worker pool.
         """
 
         if sub is None:
             sub = {}
         cb = self.guard_error(cb if callable(cb) else self.on_input)
+        if blocking:
+            cb = self.blocking(cb)
 
         # Add input
         self.__inputs.setdefault(handle, ([], sub))[0].append(cb)
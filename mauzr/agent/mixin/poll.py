@@ -1,12 +1,19 @@
 """ Mixins for agent functions. """
 
 from contextlib import contextmanager
+from mauzr.scheduler import Task
 
 __author__ = "Alexander Sowitzki"
 
 
 class PollMixin:
-    """ Provide polling a callable regularly. """
+    """ Provide polling a callable regularly.
+
+    Polls happen at a fixed rate. If polls were missed because the scheduler
+    was busy, a single poll is done and the original rate is resumed.
+    Polls may be delayed by the configured slack to share wake ups of the
+    scheduler with other tasks.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -15,12 +22,15 @@ class PollMixin:
 
         # Make poll interval configurable.
         self.option("interval", "struct/!I", "Poll intervall in milliseconds")
+        self.option("slack", "struct/!I",
+                    "Allowed poll delay in milliseconds", default=0)
         self.add_context(self.__poll_context)
 
     @contextmanager
     def __poll_context(self):
-        self.poll_task = self.every(self.interval/1000,
-                                    self.poll).enable(instant=True)
+        self.poll_task = self.every(self.interval/1000, self.poll)
+        self.poll_task.fixed_rate(Task.COALESCE).tolerate(self.slack/1000)
+        self.poll_task.enable(instant=True)
         yield
         self.poll_task = None
 
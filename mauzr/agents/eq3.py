@@ -12,10 +12,13 @@ class Driver(PollMixin, Agent):
         super().__init__(*args, **kwargs)
 
         self.output_topic("valve", r"struct\/B", "Current value state")
-        self.input_topic("target", r"struct\/\!f", "Target temperature")
+        self.input_topic("target", r"struct\/\!f", "Target temperature",
+                         blocking=True)
 
         self.option("mac", "str", "MAC address of the thermostat")
         self.thermostat = None
+        # Bluetooth communication blocks, do it on the worker pool.
+        self.update = self.blocking(self.read_valve, done=self.on_valve)
         self.update_agent(arm=True)
 
     @contextmanager
@@ -27,12 +30,30 @@ class Driver(PollMixin, Agent):
     def poll(self):
         """ Poll the valve state. """
 
+        self.update()
+
+    def read_valve(self):
+        """ Read the valve state. Runs on the worker pool.
+
+        Returns:
+            int: Valve state or None if reading failed.
+        """
+
         try:
             self.thermostat.update()
         except bluepy.btle.BTLEException:
-            pass
-        else:
-            self.valve(self.thermostat.valve_state)
+            return None
+        return self.thermostat.valve_state
+
+    def on_valve(self, state):
+        """ Publish a read valve state.
+
+        Args:
+            state (int): Valve state or None if reading failed.
+        """
+
+        if state is not None:
+            self.valve(state)
 
     def on_input(self, target):
         self.thermostat.target_temperature = target
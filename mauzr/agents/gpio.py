@@ -6,7 +6,6 @@ import os
 import mmap
 import select
 import io
-import threading
 from contextlib import contextmanager, suppress
 from mauzr.agent import Agent
 
@@ -71,26 +70,21 @@ class Input(Agent):
 
         self.output(not self.value if self.invert else self.value)
 
-    def select_inputs(self):
-        """ Select the GPI until it has a new value. """
-
-        while True:
-            try:
-                select.select([], [], [self.fd])
-                if self.fd is None:
-                    return
-                # Rewind file.
-                self.fd.seek(0, io.SEEK_SET)
-                # Read and convert value.
-                self.value = self.fd.read(1) == "1"
-                # Since the value has changed (re-)start the stabilize task.
-                self.stabilize_task.enable()
-            except OSError:
-                if self.fd is not None:
-                    # Log exception into logger.
-                    self.log.exception("Error with select")
-                    # Restart agent on error.
-                    self.update_agent(restart=True)
+    def on_edge(self, _events):
+        """ Read the new value of the GPI after an edge was detected. """
+
+        try:
+            # Rewind file.
+            self.fd.seek(0, io.SEEK_SET)
+            # Read and convert value.
+            self.value = self.fd.read(1) == "1"
+            # Since the value has changed (re-)start the stabilize task.
+            self.stabilize_task.enable()
+        except OSError:
+            # Log exception into logger.
+            self.log.exception("Error reading value")
+            # Restart agent on error.
+            self.update_agent(restart=True)
 
     @contextmanager
     def setup(self):
@@ -105,12 +99,12 @@ class Input(Agent):
         open(f"/sys/class/gpio/gpio{identifier}/edge", "w").write(edge + "\n")
         # Open value file.
         with open(f"/sys/class/gpio/gpio{identifier}/value", "rt") as self.fd:
-            # Dispatch a dedicated thread for selecting the value file.
-            threading.Thread(target=self.select_inputs,
-                             name=f"GPIO {identifier} select",
-                             daemon=True).start()
+            # Let the scheduler watch the value file for edges.
+            self.sched.register(self.fd, self.on_edge,
+                                select.POLLPRI | select.POLLERR)
             # Yield
             yield
+            self.sched.unregister(self.fd)
             self.fd = None
         self.stabilize_task = None
 
@@ -19,12 +19,28 @@ class Processor(Agent):
         self.option("resize", "struct/!H", "Resize to resolution")
         self.option("timestamp", "struct/?", "Apply timestamp")
         self.option("rotate", "struct/!H", "Rotation in degrees")
-        self.input_topic("input", r"image/.*", "Input image")
+        self.input_topic("input", r"image/.*", "Input image",
+                         cb=self.blocking(self.convert, done=self.on_converted))
         self.output_topic("output", r"image/.*", "Input image")
         self.update_agent(arm=True)
 
-    def on_input(self, image):
-        """ Convert image. """
+    def on_converted(self, image):
+        """ Publish a converted image.
+
+        Args:
+            image (numpy.ndarray): Converted image.
+        """
+
+        self.output(image)
+
+    def convert(self, image):
+        """ Convert image. Runs on the worker pool.
+
+        Args:
+            image (numpy.ndarray): Image to convert.
+        Returns:
+            numpy.ndarray: Converted image.
+        """
 
         if self.rotate in ROTATION_MAP:
             flip = ROTATION_MAP[self.rotate]
@@ -35,4 +51,4 @@ class Processor(Agent):
             text = str(datetime.datetime.now())
             cv2.putText(image, text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1,
                         (255, 0, 0), 3, cv2.LINE_AA)
-        self.output(image)
+        return image
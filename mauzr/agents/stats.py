@@ -0,0 +1,27 @@
+""" Publishing of shell runtime statistics. """
+
+from mauzr import Agent, PollMixin
+from mauzr.serializer import JSON
+
+__author__ = "Alexander Sowitzki"
+
+
+class SchedulerPublisher(PollMixin, Agent):
+    """ Publish scheduler statistics regularly.
+
+    The summary of :class:`mauzr.scheduler.SchedulerStats` is published as
+    JSON to stats/<shell>/sched.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        ser = JSON(shell=self.shell, desc="Scheduler statistics")
+        self.handle = self.shell.mqtt(topic=f"stats/{self.shell.name}/sched",
+                                      ser=ser, qos=0, retain=True)
+        self.update_agent(arm=True)
+
+    def poll(self):
+        """ Publish the current statistics. """
+
+        self.handle(self.sched.stats.summary())
@@ -14,9 +14,10 @@ class Notify(Agent):
 
     When the shell is started via systemd this agent can be used to create
     a systemd service with the type notify. The agent informs systemd about
-    the successful start and handles the watchdog. The watchdog is triggered
-    every 5 seconds. If the scheduler blocks for too long the service is
-    restarted.
+    the successful start and handles the watchdog. The systemd watchdog is
+    triggered by the watchdog of the scheduler as long as no callback blocks
+    the scheduler, so the service is restarted if the scheduler is stuck. If
+    the scheduler watchdog is disabled, it is triggered every 5 seconds.
     """
 
     sock = socket(AF_UNIX, SOCK_DGRAM | SOCK_CLOEXEC)
@@ -41,10 +42,16 @@ class Notify(Agent):
     def setup(self):
         # Mark service as started and activate watchdog.
         self.send("READY=1\nWATCHDOG=1\nSTATUS=Running\n")
-        self.task = self.every(5, self.reset_watchdog).enable(instant=True)
+        watchdog = self.sched.watchdog
+        if watchdog.budget:
+            watchdog.add_feeder(self.reset_watchdog)
+        else:
+            self.task = self.every(5, self.reset_watchdog).enable(instant=True)
 
         yield
 
+        if watchdog.budget:
+            watchdog.remove_feeder(self.reset_watchdog)
         self.task = None
 
         # Notify about stop.
@@ -60,7 +67,7 @@ class Notify(Agent):
         self.send(f"STATUS={status}\n")
 
     def reset_watchdog(self):
-        """ Reset the watchdog. """
+        """ Reset the watchdog. May be called from any thread. """
 
         self.send("WATCHDOG=1\n")
 
@@ -82,7 +89,7 @@ class Service(Agent):
         super().__init__(*args, **kwargs)
 
         self.input_topic("active", r"struct\/\?",
-                         "If target service should be active")
+                         "If target service should be active", blocking=True)
         self.option("service", "str", "Name of the service to manage")
 
         self.add_context(self.setup)
@@ -90,7 +97,7 @@ class Service(Agent):
 
 
     def on_input(self, requested):
-        """ Set active state. """
+        """ Set active state. Runs on the worker pool. """
 
         running = subprocess.call(["systemctl", "is-active", self.service]) == 0
         if running == requested:
@@ -44,10 +44,10 @@ class TemperatureSettable(Light):
         super().__init__(*args, **kwargs)
 
         self.input_topic("temperature", r"struct/B", "Color temperature",
-                         cb=self.temperature)
+                         cb=self.temperature, blocking=True)
 
     def temperature(self, value):
-        """ Set temperature value. """
+        """ Set temperature value. Runs on the worker pool. """
 
         value = min(value+250, 454)
         self.api(self.light.light_control.set_color_temp(value))
@@ -60,10 +60,10 @@ class IntensitySettable(Light):
         super().__init__(*args, **kwargs)
 
         self.input_topic("intensity", r"struct/B", "Dimmer setting",
-                         cb=self.intensity)
+                         cb=self.intensity, blocking=True)
 
     def intensity(self, value):
-        """ Set dimm value. """
+        """ Set dimm value. Runs on the worker pool. """
 
         value = min(value, 254)
         self.api(self.light.light_control.set_dimmer(value))
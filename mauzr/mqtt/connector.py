@@ -1,12 +1,13 @@
 """ MQTT connection facilities. """
 
+import asyncio
+import io
 import re
 import threading
 import socket
 import ssl
 import shelve
 import weakref
-import time
 import dns.resolver
 from dns.exception import DNSException
 from .messages import Connect, ConnAck, Disconnect, PingReq, PingResp
@@ -133,23 +134,17 @@ class QoSShelf:
         self.update_all_sent()
 
 
-def default_socket_factory(log, domain, ca, crt, key):  # pragma: no cover
-    """ Create a factory for server connection info generators.
+def default_tls_context(ca, crt, key):  # pragma: no cover
+    """ Create the TLS context for broker connections.
 
     Args:
-        log (logging.Logger): Logger to use.
-        domain (str): Domain to connect to.
         ca (str): Certificate authority to use.
         crt (str): Certificate file for the client.
         key (str): Key file for the client.
     Returns:
-        callable: Factory that returns a generrator for server connection info.\
-                  The generator returns tuples containing hostname, port and \
-                  CA for TLS.
+        ssl.SSLContext: Prepared context.
     """
 
-    query = f"_secure-mqtt._tcp.{domain}"
-
     ctx = ssl.SSLContext()
     ctx.load_verify_locations(cafile=ca)
     ctx.load_cert_chain(certfile=crt, keyfile=key)
@@ -158,29 +153,95 @@ def default_socket_factory(log, domain, ca, crt, key):  # pragma: no cover
     ctx.verify_mode = ssl.CERT_REQUIRED
     ctx.minimum_version = ssl.TLSVersion.TLSv1_2
     ctx.check_hostname = True
+    return ctx
+
+
+def srv_targets(log, domain):  # pragma: no cover
+    """ Resolve broker addresses via DNS SRV records.
+
+    Args:
+        log (logging.Logger): Logger to use.
+        domain (str): Domain to look up.
+    Yields:
+        tuple: Hostname and port of a broker or None if resolving failed.
+    """
+
+    query = f"_secure-mqtt._tcp.{domain}"
+    resolver = dns.resolver.Resolver()
+    resolver.timeout = 5
+    resolver.lifetime = 5
+    while True:
+        try:
+            records = resolver.query(query, 'SRV')
+        except DNSException:
+            log.exception("Name resolving failed")
+            yield None
+            continue
+
+        for record in records:
+            yield str(record.target), record.port
+
+
+def default_socket_factory(log, domain, ca, crt, key):  # pragma: no cover
+    """ Create a factory for server connection info generators.
+
+    Args:
+        log (logging.Logger): Logger to use.
+        domain (str): Domain to connect to.
+        ca (str): Certificate authority to use.
+        crt (str): Certificate file for the client.
+        key (str): Key file for the client.
+    Returns:
+        callable: Factory that returns a generrator for server connection info.\
+                  The generator returns tuples containing hostname, port and \
+                  CA for TLS.
+    """
+
+    ctx = default_tls_context(ca, crt, key)
 
     def _new():
-        resolver = dns.resolver.Resolver()
-        resolver.timeout = 5
-        resolver.lifetime = 5
-        while True:
-            try:
-                records = resolver.query(query, 'SRV')
-            except DNSException:
-                log.exception("Name resolving failed")
+        for target in srv_targets(log, domain):
+            if target is None:
                 yield None
                 continue
+            host, port = target
+            # Open socket and perform handshake
+            log.debug("Opening Socket to %s:%s", host, port)
+            try:
+                sock = socket.create_connection((host, port))
+                yield ctx.wrap_socket(sock, server_hostname=host.strip("."))
+            except (ValueError, OSError):
+                log.exception("Establishing Connection failed")
+                yield None
+    return _new
 
-            for record in records:
-                host, port = str(record.target), record.port
-                # Open socket and perform handshake
-                log.debug("Opening Socket to %s:%s", host, port)
-                try:
-                    sock = socket.create_connection((host, port))
-                    yield ctx.wrap_socket(sock, server_hostname=host.strip("."))
-                except (ValueError, OSError):
-                    log.exception("Establishing Connection failed")
-                    yield None
+
+def default_stream_factory(log, domain, ca, crt, key):  # pragma: no cover
+    """ Create a factory for asyncio stream generators.
+
+    Args:
+        log (logging.Logger): Logger to use.
+        domain (str): Domain to connect to.
+        ca (str): Certificate authority to use.
+        crt (str): Certificate file for the client.
+        key (str): Key file for the client.
+    Returns:
+        callable: Factory that returns a generator for awaitables opening \
+                  a stream reader and writer pair to the server. \
+                  The generator may block and yields None on failure.
+    """
+
+    ctx = default_tls_context(ca, crt, key)
+
+    def _new():
+        for target in srv_targets(log, domain):
+            if target is None:
+                yield None
+                continue
+            host, port = target
+            log.debug("Opening stream to %s:%s", host, port)
+            yield asyncio.open_connection(host, port, ssl=ctx,
+                                          server_hostname=host.strip("."))
     return _new
 
 
@@ -200,6 +261,7 @@ class Connector:
         args = shell.args
         keepalive, sched = args.keepalive, shell.sched
         assert keepalive < 65536
+        self.keepalive = keepalive
 
         # Setup logger.
         self.log = shell.log.getChild("mqtt")
@@ -261,20 +323,35 @@ class Connector:
             if self.sock is None:
                 return
             self._handshake()
-
-            # Inform listeners.
-            [cb(True) for cb in self.connection_listeners]
-            # Set us as idle task.
-            self.sched.idle(self._read)
-            # Set timers.
-            self.connect_task.disable()
-            self.timeout_task.enable()
-            self.ping_task.enable()
-            self.log.info("Connected")
+            self._connected()
         except OSError:
             self.log.exception("Connection failed")
             self.disconnect()
 
+    def _connected(self):  # pragma: no cover
+        """ Start operation after the handshake succeeded. """
+
+        # Inform listeners.
+        [cb(True) for cb in self.connection_listeners]
+        self._attach()
+        # Set timers.
+        self.connect_task.disable()
+        self.timeout_task.enable()
+        self.ping_task.enable()
+        self.log.info("Connected")
+
+    def _attach(self):  # pragma: no cover
+        """ Start reading from the connection. """
+
+        # Read when the socket becomes ready.
+        self.sock.settimeout(self.keepalive)
+        self.sched.register(self.sock, self._on_readable)
+
+    def _detach(self):  # pragma: no cover
+        """ Stop reading from the connection. """
+
+        self.sched.unregister(self.sock)
+
     def _handshake(self):  # pragma: no cover
         """ Perform actual connect with the server. """
 
@@ -287,7 +364,15 @@ class Connector:
         if ConnAck.TYPE != op:
             raise MQTTProtocolError(f"Did not receive CONNACK: {op}")
 
-        session_cleared = ConnAck(sock, op).session_cleared
+        self._session_started(ConnAck(sock, op).session_cleared)
+
+    def _session_started(self, session_cleared):  # pragma: no cover
+        """ Resume the session after the broker acknowledged the connect.
+
+        Args:
+            session_cleared (bool): True if the broker started a new session.
+        """
+
         if session_cleared:
             self.qos_shelf.clear()
 
@@ -324,7 +409,7 @@ class Connector:
             self.connect_task.enable()
         else:
             self.connect_task.disable()
-        self.sched.idle(time.sleep)
+        self._detach()
 
         self.log.debug("Disconnecting")
         try:
@@ -462,28 +547,37 @@ class Connector:
             raise MQTTOfflineError()
         return pkg_id
 
-    def _read(self, duration):  # pragma: no cover
+    def _on_readable(self, _events):  # pragma: no cover
+        """ Read all messages that are available from the server. """
+
+        self._read()
+        # TLS may have buffered further records the poller does not see.
+        while self.sock is not None and self.sock.pending():
+            self._read()
+
+    def _read(self):  # pragma: no cover
         """ Read message from server.
 
-        Args:
-            duration (float): Duration in seconds to block while waiting \
-                              for messages.
         Raises:
             MQTTProtocolError: If an invalid message was received from server.
         """
 
-        # Read one byte for the specified duration.
         try:
-            self.sock.settimeout(duration)
-            try:
-                op = self.sock.recv(1)[0]
-            except (OSError, IndexError):
-                return
-            self.sock.settimeout(False)
-        except OSError:
+            op = self.sock.recv(1)[0]
+        except (OSError, IndexError):
+            # Connection was closed or broke.
             self.disconnect()
             return
+        self._dispatch(op)
+
+    def _dispatch(self, op):  # pragma: no cover
+        """ Receive and handle the remainder of a message from the server.
 
+        Args:
+            op (int): Op code of the message.
+        Raises:
+            MQTTProtocolError: If an invalid message was received from server.
+        """
 
         # Reset timeout.
         self.timeout_task.enable()
@@ -599,3 +693,162 @@ class Connector:
                f"Conflicting configuration for topic {topic}: qos {h.qos} "\
                f"- {qos}, retain {h.retain} - {retain}, ser {h.ser} - {ser}"
         return h
+
+
+class _StreamSocket:
+    """ Socket lookalike for the message classes on top of asyncio streams.
+
+    Received frames are fed into a buffer the messages read from, sent
+    messages are passed to the stream writer.
+
+    Args:
+        writer (asyncio.StreamWriter): Writer of the connection.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.buf = io.BytesIO()
+
+    def feed(self, data):
+        """ Provide the remainder of a received frame.
+
+        Args:
+            data (bytes): Frame data following the op code.
+        """
+
+        self.buf = io.BytesIO(data)
+
+    def recv(self, size):
+        """ Read from the current frame.
+
+        Args:
+            size (int): Amount of bytes to read.
+        Returns:
+            bytes: Read data.
+        """
+
+        return self.buf.read(size)
+
+    def send(self, data):
+        """ Write data to the connection.
+
+        Args:
+            data (bytes): Data to write.
+        """
+
+        if self.writer.is_closing():
+            raise ConnectionResetError("Stream is closed")
+        self.writer.write(data)
+
+    @staticmethod
+    def pending():
+        """
+        Returns:
+            int: Always 0, the stream reader buffers TLS itself.
+        """
+
+        return 0
+
+
+class AsyncioConnector(Connector):
+    """ Connector that communicates via asyncio streams.
+
+    Requires a :class:`mauzr.scheduler.AsyncioScheduler` as shell scheduler.
+    Connecting and reading run as tasks of the scheduler event loop, so
+    reading never blocks the loop.
+
+    Args:
+        shell (mauzr.shell.Shell): Shell instance to use.
+        socket_factory (callable): Factory for stream openers.
+        shelf_factory (callable): Factory method for creating the QoS shelf.
+    """
+
+    def __init__(self, shell, socket_factory=default_stream_factory,
+                 shelf_factory=QoSShelf):  # pragma: no cover
+        super().__init__(shell, socket_factory, shelf_factory)
+        self.loop = shell.sched.loop
+        self.connecting, self.reader, self.reader_task = False, None, None
+
+    def connect(self):  # pragma: no cover
+        """ Start connecting to the mqtt server. """
+
+        if not self.connecting:
+            self.connecting = True
+            self.loop.create_task(self._connect())
+
+    async def _connect(self):  # pragma: no cover
+        """ Connect to the mqtt server. """
+
+        try:
+            # Resolving may block, keep it away from the loop.
+            opener = await self.loop.run_in_executor(None, next,
+                                                     self.socket_factory)
+            if opener is None:
+                return
+            self.reader, writer = await opener
+            self.sock = _StreamSocket(writer)
+
+            # Exchange connect packages.
+            self.log.debug("Sending connect")
+            self.sock.send(self.connect_pkg)
+            self.log.debug("Receiving connect")
+            op = await self._read_frame()
+            if ConnAck.TYPE != op:
+                raise MQTTProtocolError(f"Did not receive CONNACK: {op}")
+            self._session_started(ConnAck(self.sock, op).session_cleared)
+            self._connected()
+        except (OSError, asyncio.IncompleteReadError):
+            self.log.exception("Connection failed")
+            self.disconnect()
+        finally:
+            self.connecting = False
+
+    async def _read_frame(self):  # pragma: no cover
+        """ Read a complete frame and feed it into the stream socket.
+
+        Returns:
+            int: Op code of the frame.
+        """
+
+        reader = self.reader
+        op = (await reader.readexactly(1))[0]
+        header, length, shift = bytearray(), 0, 0
+        while True:
+            b = (await reader.readexactly(1))[0]
+            header.append(b)
+            length |= (b & 0x7f) << shift
+            if not b & 0x80:
+                break
+            shift += 7
+        self.sock.feed(bytes(header) + await reader.readexactly(length))
+        return op
+
+    async def _read_loop(self):  # pragma: no cover
+        """ Read and dispatch messages until the connection ends. """
+
+        try:
+            while self.sock is not None:
+                self._dispatch(await self._read_frame())
+        except (OSError, asyncio.IncompleteReadError):
+            self.disconnect()
+
+    def _attach(self):  # pragma: no cover
+        self.reader_task = self.loop.create_task(self._read_loop())
+
+    def _detach(self):  # pragma: no cover
+        task, self.reader_task = self.reader_task, None
+        if task is not None and task is not asyncio.current_task(self.loop):
+            task.cancel()
+
+    def disconnect(self, await_all_sent=False,
+                   reconnect=True):  # pylint: disable=unused-argument
+        """ Disconnect from server.
+
+        Waiting for outstanding messages is not supported since it would block
+        the loop that receives the acknowledgements.
+        """
+
+        sock = self.sock
+        super().disconnect(await_all_sent=False, reconnect=reconnect)
+        if sock is not None:
+            sock.writer.close()
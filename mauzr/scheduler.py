@@ -1,8 +1,16 @@
 """ Common parts for a task scheduler. """
 
+import asyncio
+import os
+import select
+import sys
 import time
+import traceback
 import weakref
-from threading import Event
+from math import inf
+from collections import deque
+from threading import Event, Thread, get_ident
+from mauzr.taskqueue import TaskHeap, TaskWheel
 
 __author__ = "Alexander Sowitzki"
 
@@ -20,6 +28,15 @@ class Task:
         kwargs (dict): Keyword arguments for callable.
     """
 
+    SKIP = "skip"
+    """ Fixed rate policy: Drop missed executions and stay on schedule. """
+
+    COALESCE = "coalesce"
+    """ Fixed rate policy: Fire once for all missed executions. """
+
+    BURST = "burst"
+    """ Fixed rate policy: Fire all missed executions back to back. """
+
     def __init__(self, sched, delay, repeat, cb, args, kwargs):
         self.sched = sched
         self.cb = cb
@@ -29,6 +46,12 @@ class Task:
         self.args = args
         self.kwargs = kwargs
         self.time_func = time.monotonic
+        self.ref = weakref.ref(self)  # Reference used by the task queue.
+        self.entry = None  # Current entry in the task queue.
+        self.stats = None  # Statistics of the callback, set when fired.
+        self.policy = None  # Catch up policy if running at fixed rate.
+        self.anchor = None  # Scheduled time of the current fixed rate slot.
+        self.slack = 0.0  # Seconds the execution may be delayed.
 
     def __lt__(self, other):
         """ Compare which task is due first.
@@ -56,15 +79,80 @@ class Task:
 
         if self.repeat:
             # If task is repeating record next execution
-            self.at = self.time_func() + self.delay
+            if self.policy is None:
+                self.at = self.time_func() + self.delay
+            else:
+                self.at = self._next_fixed()
+            self.sched.schedule(self)
         else:
             # Clear execution timestamp
             self.at = None
-        # Inform scheduler task changed
-        self.sched.tasks_changed = True
+            self.sched.unschedule(self)
         # Fire callback
         self.cb(*self.args, **self.kwargs)
 
+    def _next_fixed(self):
+        """ Advance the fixed rate schedule.
+
+        Returns:
+            float: Next execution time.
+        """
+
+        now, delay, policy = self.time_func(), self.delay, self.policy
+        at = self.anchor + delay
+        if at > now or policy == self.BURST or delay <= 0:
+            self.anchor = at
+            return at
+
+        # Behind schedule, count slots that are already due.
+        missed = int((now - self.anchor) // delay)
+        if policy == self.SKIP:
+            self.anchor += (missed + 1) * delay
+            return self.anchor
+        # Coalesce, fire now and continue after the last missed slot.
+        self.anchor += missed * delay
+        return now
+
+    def fixed_rate(self, policy=SKIP):
+        """ Anchor executions to the original schedule.
+
+        By default the next execution is scheduled relative to the start of
+        the current one, so latencies add up. With a fixed rate the task
+        fires at multiples of its delay since it was enabled.
+
+        Args:
+            policy (str): What to do when executions were missed, one of \
+                          SKIP, COALESCE or BURST.
+        Returns:
+            Task: This task.
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+
+        if policy not in (self.SKIP, self.COALESCE, self.BURST):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.policy = policy
+        return self
+
+    def tolerate(self, slack):
+        """ Allow the execution to be delayed to share a wake up.
+
+        The scheduler may fire the task up to the given amount of seconds
+        after it is due, so tasks that are due shortly after each other are
+        fired together instead of waking up the scheduler for each of them.
+
+        Args:
+            slack (float): Seconds the execution may be delayed.
+        Returns:
+            Task: This task.
+        """
+
+        self.slack = slack
+        if self:
+            # Queues may file the task by its latest execution time.
+            self.sched.schedule(self)
+        return self
+
     def set(self, delay):
         """ Set the delay of this task.
 
@@ -86,7 +174,8 @@ class Task:
         self.at = self.time_func()
         if not instant:
             self.at += self.delay
-        self.sched.tasks_changed = True
+        self.anchor = self.at
+        self.sched.schedule(self)
         return self
 
     def disable(self):
@@ -97,7 +186,7 @@ class Task:
         """
 
         self.at = None
-        self.sched.tasks_changed = True
+        self.sched.unschedule(self)
         return self
 
     def __bool__(self):
@@ -109,6 +198,233 @@ class Task:
         return self.at is not None
 
 
+class Histogram:
+    """ Histogram of durations with exponentially growing buckets.
+
+    Bucket i counts values up to base * 2^i seconds, the last bucket
+    counts all larger values.
+
+    Args:
+        base (float): Upper bound of the first bucket in seconds.
+        size (int): Amount of buckets.
+    """
+
+    def __init__(self, base=0.0001, size=16):
+        self.base, self.buckets = base, [0] * size
+        self.count, self.total, self.max = 0, 0.0, 0.0
+
+    def add(self, value):
+        """ Record a value.
+
+        Args:
+            value (float): Value in seconds.
+        """
+
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        index = max(0, int(value / self.base)).bit_length()
+        self.buckets[min(index, len(self.buckets) - 1)] += 1
+
+    def bounds(self):
+        """
+        Returns:
+            list: Upper bound of each bucket except the last one.
+        """
+
+        return [self.base * 2 ** i for i in range(len(self.buckets) - 1)]
+
+    def summary(self):
+        """
+        Returns:
+            dict: Count, mean, max and bucket counts.
+        """
+
+        return {"count": self.count, "max": self.max,
+                "mean": self.total / self.count if self.count else 0.0,
+                "buckets": list(self.buckets)}
+
+
+class SchedulerStats:
+    """ Runtime statistics of a scheduler.
+
+    Lateness and duration of task callbacks are recorded per callback name,
+    so callbacks of tasks that are recreated are combined.
+
+    Args:
+        time_func (callable): Clock to use.
+    """
+
+    def __init__(self, time_func=time.monotonic):
+        self.time_func = time_func
+        self.started = time_func()
+        self.iterations, self.wakeups, self.idle_time = 0, 0, 0.0
+        self.saved_wakeups = 0  # Wake ups avoided by task slack.
+        self.callbacks = {}  # Lateness and duration histogram per name.
+
+    @staticmethod
+    def name(cb):
+        """ Get the name statistics of a callback are recorded under.
+
+        Args:
+            cb (callable): Callback of a task.
+        Returns:
+            str: Name of the callback, prefixed by the name of its owner.
+        """
+
+        name = getattr(cb, "__qualname__", None) or repr(cb)
+        owner = getattr(getattr(cb, "__self__", None), "name", None)
+        return f"{owner}:{name}" if isinstance(owner, str) else name
+
+    def fired(self, task, lateness, duration):
+        """ Record a fired task.
+
+        Args:
+            task (Task): Task that was fired.
+            lateness (float): Seconds the task was fired after it was due.
+            duration (float): Seconds the callback took.
+        """
+
+        stats = task.stats
+        if stats is None:
+            name = self.name(task.cb)
+            stats = self.callbacks.get(name)
+            if stats is None:
+                stats = self.callbacks[name] = (Histogram(), Histogram())
+            task.stats = stats
+        stats[0].add(max(0.0, lateness))
+        stats[1].add(duration)
+
+    def idled(self, duration):
+        """ Record idle time.
+
+        Args:
+            duration (float): Seconds the scheduler idled.
+        """
+
+        self.wakeups += 1
+        self.idle_time += duration
+
+    def summary(self):
+        """
+        Returns:
+            dict: Statistics since the scheduler was created.
+        """
+
+        uptime = self.time_func() - self.started
+        callbacks = {name: {"lateness": lateness.summary(),
+                            "duration": duration.summary()}
+                     for name, (lateness, duration) in self.callbacks.items()}
+        return {"uptime": uptime, "iterations": self.iterations,
+                "wakeups": self.wakeups, "saved_wakeups": self.saved_wakeups,
+                "idle_time": self.idle_time,
+                "idle_share": self.idle_time / uptime if uptime else 0.0,
+                "bounds": Histogram().bounds(), "callbacks": callbacks}
+
+
+class Watchdog:
+    """ Thread that detects callbacks blocking the scheduler.
+
+    The scheduler marks each callback it runs. If a callback exceeds the
+    budget, it is logged together with a stack sample of the scheduler
+    thread. While no callback exceeds the budget, the feed callbacks are
+    called from the watchdog thread, so they stop only if the scheduler
+    is actually stuck.
+
+    Args:
+        sched (Scheduler): Scheduler to watch.
+        budget (float): Seconds a single callback may take.
+    """
+
+    def __init__(self, sched, budget):
+        self.log = sched.log.getChild("watchdog")
+        self.time_func = sched.time_func
+        self.budget = budget  # Watchdog is disabled if zero.
+        self.busy = None  # Running callback and the time it is overdue.
+        self.feeders = []
+        self.ident = None  # Identifier of the scheduler thread.
+        self.stopped = Event()
+        self.thread = None
+
+    def enter(self, cb, since, duration=0):
+        """ Mark a callback as running. Called by the scheduler thread.
+
+        Args:
+            cb (callable): Callback that is about to be run.
+            since (float): Point in time the callback was started.
+            duration (float): Seconds the callback is expected to block \
+                              in addition to the budget.
+        """
+
+        self.busy = (cb, since + self.budget + duration)
+
+    def leave(self):
+        """ Mark that the running callback returned. """
+
+        self.busy = None
+
+    def add_feeder(self, cb):
+        """ Call a callable regularly while the scheduler is not stuck.
+
+        Args:
+            cb (callable): Callable to call from the watchdog thread.
+        """
+
+        self.feeders.append(cb)
+
+    def remove_feeder(self, cb):
+        """ Stop calling a feeder.
+
+        Args:
+            cb (callable): Callable that was added before.
+        """
+
+        self.feeders.remove(cb)
+
+    def start(self):
+        """ Start watching the calling thread if a budget is set. """
+
+        if not self.budget:
+            return
+        self.ident, self.busy = get_ident(), None
+        self.stopped.clear()
+        self.thread = Thread(target=self.run, name="watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """ Stop watching. """
+
+        self.stopped.set()
+
+    def run(self):
+        """ Check the scheduler until stopped. """
+
+        reported = None
+        while not self.stopped.wait(self.budget / 2):
+            busy = self.busy
+            if busy is not None and self.time_func() > busy[1]:
+                if busy is not reported:
+                    reported = busy
+                    self.report(busy[0])
+                continue
+            for feeder in tuple(self.feeders):
+                feeder()
+
+    def report(self, cb):
+        """ Log a callback that exceeded its budget.
+
+        Args:
+            cb (callable): Offending callback.
+        """
+
+        # pylint: disable=protected-access
+        frame = sys._current_frames().get(self.ident)
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        self.log.error("%s blocks the scheduler for more than %ss:\n%s",
+                       SchedulerStats.name(cb), self.budget, stack)
+
+
 class Scheduler:
     """ Scheduler that executes tasks and callbacks
 
@@ -116,14 +432,27 @@ class Scheduler:
         shell (mauzr.shell.Shell): Program shell.
     """
 
+    QUEUES = {"heap": TaskHeap, "wheel": TaskWheel}
+    """ Task queue implementations selectable by the scheduler argument. """
+
     def __init__(self, shell):
         self.log = shell.log.getChild("sched")
         self.log.debug("Setting up scheduler")
         self.tasks = []
-        self.idle_cb = time.sleep
-        self.tasks_changed = False
+        self.queue = self.QUEUES[shell.args.scheduler]()
+        self.time_func = time.monotonic
+        self.stats = SchedulerStats(self.time_func)
+        self.idle_cb = None  # Custom idle callback, wait() if not set.
         self.max_sleep = shell.args.max_sleep
         self.shutdown_request = Event()
+        self.watchdog = Watchdog(self, shell.args.watchdog)
+
+        # Reactor for file descriptors.
+        self.poller, self.files = select.poll(), {}
+        self.wakeup_fds = os.pipe()
+        [os.set_blocking(fd, False) for fd in self.wakeup_fds]
+        self.register(self.wakeup_fds[0], self._drain_wakeup)
+        self.calls = deque()  # Calls passed in from other threads.
 
     @staticmethod
     def delay_to(task):
@@ -151,7 +480,7 @@ class Scheduler:
 
         t = Task(sched=self, delay=delay, cb=cb, repeat=True,
                  args=args, kwargs=kwargs)
-        self.tasks.append(weakref.ref(t, self.tasks.remove))
+        self.tasks.append(weakref.ref(t, self._forget))
         return t
 
     def after(self, delay, cb, *args, **kwargs):
@@ -170,23 +499,137 @@ class Scheduler:
 
         t = Task(sched=self, delay=delay, cb=cb, repeat=False,
                  args=args, kwargs=kwargs)
-        self.tasks.append(weakref.ref(t, self.tasks.remove))
+        self.tasks.append(weakref.ref(t, self._forget))
         return t
 
+    def _forget(self, ref):
+        """ Remove a collected task.
+
+        Args:
+            ref (weakref.ref): Dead reference to the task.
+        """
+
+        self.tasks.remove(ref)
+        # A queue entry of the task may be left behind.
+        self.queue.mark_stale()
+
+    def schedule(self, task):
+        """ (Re)schedule a task at its execution time. Called by the task.
+
+        Args:
+            task (Task): Task to schedule.
+        """
+
+        self.queue.push(task)
+
+    def unschedule(self, task):
+        """ Remove a task from the schedule. Called by the task.
+
+        Args:
+            task (Task): Task to remove.
+        """
+
+        self.queue.discard(task)
+
     def idle(self, cb):
         """ Set idle callback.
 
         This callable will be executed when the scheduler has idle time.
-        The idle time (in seconds, float) will be passed as first argument.
-        The callable is expected to return after the idle time has passed.
+        The idle time (in seconds, float) will be passed as first argument,
+        it is limited by the max sleep argument. The callable is expected to
+        return after the idle time has passed. Registered files are not
+        watched while a custom idle callback is set.
 
         Args:
-            cb (callable): Callable that will be executed on idle time.
+            cb (callable): Callable that will be executed on idle time. \
+                           If None, the scheduler waits for registered files.
         """
 
-        assert callable(cb)
+        assert cb is None or callable(cb)
         self.idle_cb = cb
 
+    def register(self, fileobj, cb, events=select.POLLIN):
+        """ Watch a file descriptor while the scheduler is idle.
+
+        Args:
+            fileobj (object): File descriptor or object with a fileno method.
+            cb (callable): Called with the occured poll events as argument \
+                           when the file is ready.
+            events (int): Poll event mask to wait for.
+        """
+
+        fd = fileobj if isinstance(fileobj, int) else fileobj.fileno()
+        self.files[fd] = cb
+        self.poller.register(fd, events)
+
+    def unregister(self, fileobj):
+        """ Stop watching a file descriptor.
+
+        Args:
+            fileobj (object): File descriptor or object with a fileno method.
+        """
+
+        fd = fileobj if isinstance(fileobj, int) else fileobj.fileno()
+        if self.files.pop(fd, None) is not None:
+            self.poller.unregister(fd)
+
+    def wait(self, timeout):
+        """ Block until a registered file is ready and dispatch its callback.
+
+        Args:
+            timeout (float): Maximum seconds to block, None for no limit.
+        """
+
+        timeout = None if timeout is None else timeout * 1000
+        files, watchdog = self.files, self.watchdog
+        for fd, events in self.poller.poll(timeout):
+            cb = files.get(fd)
+            if cb is not None:  # May have been unregistered meanwhile.
+                watchdog.enter(cb, self.time_func())
+                cb(events)
+                watchdog.leave()
+
+    def wakeup(self):
+        """ Interrupt a blocking wait. May be called from any thread. """
+
+        try:
+            os.write(self.wakeup_fds[1], b"\x00")
+        except BlockingIOError:
+            pass  # Pipe is full, wakeup is pending anyway.
+
+    def call_soon(self, cb, *args):
+        """ Execute a callable in the scheduler thread as soon as possible.
+
+        May be called from any thread.
+
+        Args:
+            cb (callable): Callable to execute.
+            args (tuple): Positional arguments for callable.
+        """
+
+        self.calls.append((cb, args))
+        self.wakeup()
+
+    def _run_calls(self):
+        """ Execute the calls passed in from other threads. """
+
+        calls, watchdog = self.calls, self.watchdog
+        while calls:
+            cb, args = calls.popleft()
+            watchdog.enter(cb, self.time_func())
+            cb(*args)
+            watchdog.leave()
+
+    def _drain_wakeup(self, _events):
+        """ Consume wakeup requests. """
+
+        while True:
+            try:
+                if not os.read(self.wakeup_fds[0], 512):
+                    return
+            except BlockingIOError:
+                return
+
     def shutdown(self):
         """ Shut down the scheduler.
 
@@ -194,27 +637,212 @@ class Scheduler:
         """
 
         self.shutdown_request.set()
+        self.wakeup()
 
     def run(self):
         """ Run scheduler. """
 
         self.log.debug("Beginning to serve")
-        tasks, max_sleep = self.tasks, self.max_sleep # Quick access
+        self.watchdog.start()
+        try:
+            self._serve()
+        finally:
+            self.watchdog.stop()
+
+    def _serve(self):
+        """ Execute tasks and idle until shut down. """
+
+        queue, max_sleep = self.queue, self.max_sleep  # Quick access
+        time_func, watchdog, stats = self.time_func, self.watchdog, self.stats
+        covered = inf  # Tasks due until here would have shared the wake up.
 
         while not self.shutdown_request.is_set():
-            if self.tasks_changed:
-                # Tasks changed, resort
-                self.tasks_changed = False
-                tasks.sort(key=lambda v: v())  # Tasks behind ref as key
-            if not tasks or not tasks[0]():
-                # No active tasks, just idle.
-                self.idle_cb(max_sleep)
-                continue
+            stats.iterations += 1
+            self._run_calls()
+
+            at, delay = queue.next_at(), None
+            if at is not None:
+                # Get delay to next task.
+                now = time_func()
+                delay = at - now
+                if delay <= 0.01:
+                    # Fire if delay is not larger than 10 ms.
+                    task = queue.pop(now + 0.01)
+                    if task is not None:
+                        at = task.at  # Changed by firing.
+                        if at > covered:
+                            # Without slack this would be another wake up.
+                            stats.saved_wakeups += 1
+                            covered = at + 0.01
+                        watchdog.enter(task.cb, now)
+                        task.fire()
+                        watchdog.leave()
+                        stats.fired(task, now - at, time_func() - now)
+                    continue
+                # Wake up when the first task runs out of slack.
+                delay = queue.next_deadline() - now
+                covered = at + 0.01 if now + delay > at + 0.01 else inf
+            else:
+                covered = inf
 
-            # Get delay to next task.
-            delay = min(max(0, self.delay_to(tasks[0]())), max_sleep)
-            if delay > 0.01:
-                # Idle if delay larger than 10 ms.
-                self.idle_cb(delay)
+            idle, before = self.idle_cb, time_func()
+            if idle is None:
+                # Block until the next task is due or a file is ready.
+                self.wait(delay)
             else:
-                tasks[0]().fire()
+                delay = max_sleep if delay is None else min(delay, max_sleep)
+                watchdog.enter(idle, before, delay)
+                idle(delay)
+                watchdog.leave()
+            stats.idled(time_func() - before)
+
+
+class AsyncioScheduler(Scheduler):
+    """ Scheduler that executes tasks on an asyncio event loop.
+
+    Tasks and registered files are handed to the loop, so multiple shells
+    and other asyncio code may share it. Exceptions raised by task callbacks
+    are passed to the exception handler of the loop.
+
+    Args:
+        shell (mauzr.shell.Shell): Program shell.
+        loop (asyncio.AbstractEventLoop): Loop to use, defaults to the \
+                                          current event loop.
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, shell, loop=None):
+        self.log = shell.log.getChild("sched")
+        self.log.debug("Setting up asyncio scheduler")
+        self.tasks = []
+        self.loop = loop if loop is not None else asyncio.get_event_loop()
+        self.time_func = self.loop.time
+        self.stats = SchedulerStats(self.time_func)  # Idle time is unknown.
+        self.watchdog = Watchdog(self, 0)  # Loop runs callbacks, disabled.
+        self.shutdown_request = Event()
+        self.stopped = None  # Event set on shutdown, created by serve().
+
+    def _forget(self, ref):
+        """ Remove a collected task.
+
+        Args:
+            ref (weakref.ref): Dead reference to the task.
+        """
+
+        self.tasks.remove(ref)
+
+    def schedule(self, task):
+        """ (Re)schedule a task at its execution time. Called by the task.
+
+        Args:
+            task (Task): Task to schedule.
+        """
+
+        self.unschedule(task)
+        when = self.loop.time() + task.at - task.time_func()
+        task.entry = self.loop.call_at(when, self._fire, task.ref)
+
+    def unschedule(self, task):
+        """ Remove a task from the schedule. Called by the task.
+
+        Args:
+            task (Task): Task to remove.
+        """
+
+        if task.entry is not None:
+            task.entry.cancel()
+            task.entry = None
+
+    def _fire(self, ref):
+        """ Fire a task if it still exists.
+
+        Args:
+            ref (weakref.ref): Reference to the task.
+        """
+
+        task = ref()
+        if task is not None:
+            task.entry = None
+            now = task.time_func()
+            lateness = now - task.at
+            task.fire()
+            self.stats.fired(task, lateness, task.time_func() - now)
+
+    def idle(self, cb):
+        """ Custom idle callbacks are not supported, the event loop idles.
+
+        Args:
+            cb (callable): Must be None.
+        Raises:
+            NotImplementedError: If a callback is given.
+        """
+
+        if cb is not None:
+            raise NotImplementedError("Idle callbacks need a blocking loop")
+
+    def register(self, fileobj, cb, events=select.POLLIN):
+        """ Watch a file descriptor via the event loop.
+
+        Args:
+            fileobj (object): File descriptor or object with a fileno method.
+            cb (callable): Called with the occured poll events as argument \
+                           when the file is ready.
+            events (int): Poll event mask, only POLLIN and POLLOUT are \
+                          supported.
+        Raises:
+            NotImplementedError: If unsupported events are requested.
+        """
+
+        if events & ~(select.POLLIN | select.POLLOUT):
+            raise NotImplementedError("Only POLLIN and POLLOUT are supported")
+        if events & select.POLLIN:
+            self.loop.add_reader(fileobj, cb, select.POLLIN)
+        if events & select.POLLOUT:
+            self.loop.add_writer(fileobj, cb, select.POLLOUT)
+
+    def unregister(self, fileobj):
+        """ Stop watching a file descriptor.
+
+        Args:
+            fileobj (object): File descriptor or object with a fileno method.
+        """
+
+        self.loop.remove_reader(fileobj)
+        self.loop.remove_writer(fileobj)
+
+    def wakeup(self):
+        """ Wake up the event loop. May be called from any thread. """
+
+        self.loop.call_soon_threadsafe(lambda: None)
+
+    def call_soon(self, cb, *args):
+        """ Execute a callable in the loop thread as soon as possible.
+
+        May be called from any thread.
+
+        Args:
+            cb (callable): Callable to execute.
+            args (tuple): Positional arguments for callable.
+        """
+
+        self.loop.call_soon_threadsafe(cb, *args)
+
+    def shutdown(self):
+        """ Shut down the scheduler. May be called from any thread. """
+
+        self.shutdown_request.set()
+        if self.stopped is not None:
+            self.loop.call_soon_threadsafe(self.stopped.set)
+
+    async def serve(self):
+        """ Wait until the scheduler is shut down. """
+
+        self.stopped = asyncio.Event()
+        if not self.shutdown_request.is_set():
+            await self.stopped.wait()
+
+    def run(self):
+        """ Run the event loop until the scheduler is shut down. """
+
+        self.log.debug("Beginning to serve")
+        self.loop.run_until_complete(self.serve())
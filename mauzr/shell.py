@@ -4,13 +4,14 @@ import sys
 import signal
 import weakref
 import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from contextlib import suppress
 import logging
 from argparse import ArgumentParser
 from os import environ as env
 from pathlib import Path
-from mauzr.mqtt.connector import Connector
-from mauzr.scheduler import Scheduler
+from mauzr.mqtt.connector import Connector, AsyncioConnector
+from mauzr.scheduler import Scheduler, AsyncioScheduler
 
 __author__ = "Alexander Sowitzki"
 
@@ -105,7 +106,11 @@ class ParameterMixin:  # pragma: no cover
         arg('--keepalive', default=env.get('MAUZR_KEEPALIVE', 60))
         arg('--backoff', default=env.get('MAUZR_BACKOFF', 10))
         arg('--max-sleep', default=env.get('MAUZR_MAX_SLEEP', 1))
+        arg('--scheduler', choices=("heap", "wheel"),
+            default=env.get('MAUZR_SCHEDULER', "heap"))
+        arg('--watchdog', type=float, default=env.get('MAUZR_WATCHDOG', 5))
         arg('--sync-interval', default=env.get('MAUZR_SYNC_INTERVAL', 60))
+        arg('--workers', type=int, default=env.get('MAUZR_WORKERS', 4))
         arg('--log-level', default=env.get('MAUZR_LOG_LEVEL', "info"))
         default = env.get('MAUZR_DATA_PATH', '/var/lib/mauzr')
         arg('--storage-path', default=default)
@@ -113,6 +118,12 @@ class ParameterMixin:  # pragma: no cover
 class CoreComponentMixin:  # pragma: no cover
     """ Mixin to provide core components to the shell. """
 
+    scheduler_factory = Scheduler
+    """ Factory for the scheduler of the shell. """
+
+    connector_factory = Connector
+    """ Factory for the MQTT connector of the shell. """
+
     def __init__(self, thin=False):
         # Setup root logger.
         self.log = logging.getLogger(self.name)
@@ -120,16 +131,32 @@ class CoreComponentMixin:  # pragma: no cover
         self.log.debug("Logger created")
 
         # Setup scheduler and MQTT.
-        self.sched = Scheduler(self)
-        self.mqtt = Connector(self)
+        self.sched = self.scheduler_factory(self)
+        self.mqtt = self.connector_factory(self)
         self.mqtt.__enter__()
+        self.executors = {}  # Worker pools, created on demand.
 
         super().__init__(thin=thin)
 
+    def executor(self, process=False):
+        """ Get a worker pool for blocking callables.
+
+        Args:
+            process (bool): If True, get the process pool, else thread pool.
+        Returns:
+            concurrent.futures.Executor: Requested pool.
+        """
+
+        if process not in self.executors:
+            factory = ProcessPoolExecutor if process else ThreadPoolExecutor
+            self.executors[process] = factory(max_workers=self.args.workers)
+        return self.executors[process]
+
     def shutdown(self):
         """ Shuts down the shell gracefully. """
 
         self.shutdown_agents()
+        [e.shutdown(wait=False) for e in self.executors.values()]
         self.mqtt.__exit__()
         self.sched.shutdown()
 
@@ -178,6 +205,30 @@ class Shell(ParameterMixin, CoreComponentMixin,
     """
 
 
+class AsyncioShell(Shell):  # pragma: no cover
+    """ Shell that runs its agents on the current asyncio event loop.
+
+    Either call :meth:`run` to run the loop or await :meth:`serve` from
+    within an asyncio service that shares the loop with other shells.
+
+    Args:
+        thin (bool): If True, core components are not spawned.
+        parser (argparse.ArgumentParser): Will be used instead of an empty \
+                                          parser if set.
+    """
+
+    scheduler_factory = AsyncioScheduler
+    connector_factory = AsyncioConnector
+
+    async def serve(self):
+        """ Serve until the scheduler is shut down. """
+
+        try:
+            await self.sched.serve()
+        finally:
+            self.shutdown()
+
+
 def main():  # pragma: no cover
     """ Program entry method.
 
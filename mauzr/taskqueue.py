@@ -0,0 +1,340 @@
+""" Queues of scheduled tasks. """
+
+import time
+from math import inf, nextafter
+from heapq import heappush, heappop, heapify
+from itertools import count
+
+__author__ = "Alexander Sowitzki"
+
+
+class TaskHeap:
+    """ Queue of scheduled tasks ordered by their execution time.
+
+    Entries are invalidated lazily: Rescheduling or disabling a task only
+    marks its current entry as stale. Stale entries are dropped when they
+    reach the top of the heap or when the heap is compacted.
+
+    Args:
+        compact_min (int): Minimal amount of stale entries before the heap \
+                           is compacted.
+    """
+
+    def __init__(self, compact_min=64):
+        self.heap = []
+        self.counter = count()
+        self.stale = 0
+        self.compact_min = compact_min
+
+    def __len__(self):
+        """
+        Returns:
+            int: Amount of entries in the heap, including stale ones.
+        """
+
+        return len(self.heap)
+
+    def push(self, task):
+        """ Add a task at its current execution time.
+
+        Args:
+            task (Task): Task to add. Any previous entry is invalidated.
+        """
+
+        if task.entry is not None:
+            self.discard(task)
+        # Counter breaks ties so task references are never compared.
+        entry = [task.at, next(self.counter), task.ref]
+        task.entry = entry
+        heappush(self.heap, entry)
+
+    def discard(self, task):
+        """ Invalidate the entry of a task.
+
+        Args:
+            task (Task): Task to remove from the queue.
+        """
+
+        entry = task.entry
+        if entry is None:
+            return
+        entry[2], task.entry = None, None
+        self.mark_stale()
+
+    def mark_stale(self):
+        """ Record that an entry became stale and compact if worthwhile. """
+
+        self.stale += 1
+        if self.stale > self.compact_min and self.stale > len(self.heap) // 2:
+            self.compact()
+
+    def compact(self):
+        """ Drop all stale entries from the heap. """
+
+        self.heap = [e for e in self.heap if e[2] is not None and e[2]()]
+        heapify(self.heap)
+        self.stale = 0
+
+    def peek(self):
+        """ Get the task that is due first.
+
+        Returns:
+            Task: Task that is due first or None if no task is scheduled.
+        """
+
+        heap = self.heap
+        while heap:
+            ref = heap[0][2]
+            task = ref() if ref is not None else None
+            if task is not None:
+                return task
+            # Entry is stale or task was collected.
+            heappop(heap)
+            if ref is None:
+                self.stale -= 1
+        return None
+
+    def next_at(self):
+        """
+        Returns:
+            float: Execution time of the task that is due first or None if \
+                   no task is scheduled.
+        """
+
+        task = self.peek()
+        return None if task is None else task.at
+
+    def next_deadline(self):
+        """ Get the latest point in time the scheduler may wake up.
+
+        Only entries that are due before the current candidate are visited,
+        their descendants in the heap are due later.
+
+        Returns:
+            float: Earliest execution time plus slack of all tasks or None \
+                   if no task is scheduled.
+        """
+
+        task = self.peek()
+        if task is None:
+            return None
+        heap, deadline, pending = self.heap, task.at + task.slack, [0]
+        size = len(heap)
+        while pending:
+            index = pending.pop()
+            at, _, ref = heap[index]
+            if at > deadline:
+                continue
+            task = ref() if ref is not None else None
+            if task is not None and at + task.slack < deadline:
+                deadline = at + task.slack
+            pending.extend(i for i in (2 * index + 1, 2 * index + 2)
+                           if i < size)
+        return deadline
+
+    def pop(self, horizon=None):
+        """ Remove the task that is due first from the queue.
+
+        Args:
+            horizon (float): If set, only return a task that is due until \
+                             this point in time.
+        Returns:
+            Task: Task that is due first or None if no task is due.
+        """
+
+        task = self.peek()
+        if task is None or horizon is not None and task.at > horizon:
+            return None
+        heappop(self.heap)
+        task.entry = None
+        return task
+
+
+class TaskWheel:
+    """ Queue of scheduled tasks backed by a hierarchical timer wheel.
+
+    Tasks are filed into slots of a fixed tick length. Slots of the lowest
+    level are expired tick by tick while the slots of higher levels cover
+    exponentially longer spans and are cascaded down when the lower level
+    wraps. (Re)scheduling and disabling a task is O(1), which suits many
+    timeout tasks that are re-armed long before they fire. Expired tasks are
+    moved into a :class:`TaskHeap` so tasks are still fired in exact order.
+    Tasks are filed by their execution time plus slack, so tasks with slack
+    expire together with the first slot they may share.
+
+    Args:
+        tick (float): Length of a slot on the lowest level in seconds.
+        bits (int): Each level has 2^bits slots.
+        depth (int): Number of levels.
+        time_func (callable): Clock the tasks are scheduled with.
+    """
+
+    def __init__(self, tick=0.01, bits=6, depth=5, time_func=time.monotonic):
+        self.tick, self.bits, self.mask = tick, bits, (1 << bits) - 1
+        self.levels = [[set() for _ in range(1 << bits)]
+                       for _ in range(depth)]
+        self.counts = [0] * depth  # References per level.
+        self.current = int(time_func() / tick)  # Last expired tick.
+        self.ready = TaskHeap()  # Expired tasks.
+
+    def __len__(self):
+        """
+        Returns:
+            int: Amount of filed references, including collected tasks.
+        """
+
+        return sum(self.counts) + len(self.ready)
+
+    def _file(self, task):
+        """ File a task into the slot matching its execution time.
+
+        Args:
+            task (Task): Task to file.
+        """
+
+        expiry = int((task.at + task.slack) / self.tick)
+        delta = expiry - self.current
+        if delta <= 0:
+            self.ready.push(task)
+            return
+
+        bits, last = self.bits, len(self.levels) - 1
+        level = 0
+        while level < last and delta >> (bits * (level + 1)):
+            level += 1
+        if delta >> (bits * (level + 1)):
+            # Out of range, refile when the farthest slot is cascaded.
+            expiry = self.current + (1 << (bits * (level + 1))) - 1
+        index = (expiry >> (bits * level)) & self.mask
+        self.levels[level][index].add(task.ref)
+        self.counts[level] += 1
+        task.entry = (level, index)
+
+    def push(self, task):
+        """ Add a task at its current execution time.
+
+        Args:
+            task (Task): Task to add. Any previous entry is invalidated.
+        """
+
+        self.discard(task)
+        self._file(task)
+
+    def discard(self, task):
+        """ Remove a task from the wheel.
+
+        Args:
+            task (Task): Task to remove from the queue.
+        """
+
+        entry = task.entry
+        if not isinstance(entry, tuple):
+            self.ready.discard(task)
+            return
+        level, index = entry
+        self.levels[level][index].discard(task.ref)
+        self.counts[level] -= 1
+        task.entry = None
+
+    @staticmethod
+    def mark_stale():
+        """ Collected tasks are dropped when their slot expires. """
+
+    def _expire(self, level, index):
+        """ Empty a slot and refile its tasks.
+
+        Args:
+            level (int): Level of the slot.
+            index (int): Index of the slot.
+        """
+
+        slot = self.levels[level][index]
+        self.levels[level][index] = set()
+        self.counts[level] -= len(slot)
+        for ref in slot:
+            task = ref()
+            if task is not None:
+                task.entry = None
+                self._file(task)
+
+    def _next_expiry(self):
+        """
+        Returns:
+            int: Next tick at which a non empty slot expires or None.
+        """
+
+        bits, mask, current, best = self.bits, self.mask, self.current, None
+        for level, slots in enumerate(self.levels):
+            if not self.counts[level]:
+                continue
+            shift = bits * level
+            base = current >> shift
+            for offset in range(1, mask + 2):
+                if slots[(base + offset) & mask]:
+                    tick = (base + offset) << shift
+                    best = tick if best is None else min(best, tick)
+                    break
+        return best
+
+    def advance(self, now):
+        """ Expire all slots up to the given point in time.
+
+        Args:
+            now (float): Point in time to advance to.
+        """
+
+        target, bits, mask = int(now / self.tick), self.bits, self.mask
+        while self.current < target:
+            current = self._next_expiry()
+            if current is None or current > target:
+                # Nothing to expire on the way.
+                self.current = target
+                return
+            self.current = current
+            # Cascade higher levels first whose lower levels wrapped.
+            for level in reversed(range(1, len(self.levels))):
+                if not current & ((1 << (bits * level)) - 1):
+                    self._expire(level, (current >> (bits * level)) & mask)
+            self._expire(0, current & mask)
+
+    def next_at(self):
+        """
+        Returns:
+            float: Earliest point in time a task may be due or None if no \
+                   task is scheduled.
+        """
+
+        at = self.ready.next_at()
+        if at is not None:
+            return at
+        tick = self._next_expiry()
+        if tick is None:
+            return None
+        at = tick * self.tick
+        while int(at / self.tick) < tick:
+            # Compensate rounding so the slot expires at the returned time.
+            at = nextafter(at, inf)
+        return at
+
+    def pop(self, horizon=None):
+        """ Remove the task that is due first from the queue.
+
+        Args:
+            horizon (float): If set, only return a task that is due until \
+                             this point in time.
+        Returns:
+            Task: Task that is due first or None if no task is due.
+        """
+
+        if horizon is not None:
+            self.advance(horizon)
+        return self.ready.pop(horizon)
+
+    def next_deadline(self):
+        """
+        Returns:
+            float: Latest point in time the scheduler may wake up or None if \
+                   no task is scheduled. Slack is already applied by filing.
+        """
+
+        return self.next_at()
@@ -1,9 +1,14 @@
 """ Test scheduler. """
 
+import asyncio
 import logging
+import os
+import threading
+import time
 import unittest
 from unittest.mock import Mock, NonCallableMock
 from mauzr.scheduler import Task, Scheduler
+from mauzr.scheduler import AsyncioScheduler, Histogram, SchedulerStats
 
 __author__ = "Alexander Sowitzki"
 
@@ -11,13 +16,14 @@ class SchedulerTest(unittest.TestCase):
     """ Test Scheduler class. """
 
     @staticmethod
-    def shell_mock():
+    def shell_mock(scheduler="heap", watchdog=0):
         """ Create shell mock. """
 
+        args = NonCallableMock(spec_set=["max_sleep", "scheduler", "watchdog"],
+                               max_sleep=1.0, scheduler=scheduler,
+                               watchdog=watchdog)
         return NonCallableMock(spec_set=["log", "args"],
-                               log=logging.getLogger(),
-                               args=NonCallableMock(spec_set=["max_sleep"],
-                                                    max_sleep=1.0))
+                               log=logging.getLogger(), args=args)
 
     def test_delay_to(self):
         """ Test delay_to method. """
@@ -64,6 +70,206 @@ class SchedulerTest(unittest.TestCase):
         self.assertEqual(1, len(sched.tasks))
         del task
         self.assertEqual(0, len(sched.tasks))
+        self.assertIsNone(sched.queue.peek())
+
+    def test_run(self):
+        """ Test task execution order of the run loop. """
+
+        for scheduler in Scheduler.QUEUES:
+            self.run_order(scheduler)
+
+    def run_order(self, scheduler):
+        """ Test task execution order with the given task queue.
+
+        Args:
+            scheduler (str): Name of the task queue.
+        """
+
+        shell = self.shell_mock(scheduler)
+        sched = Scheduler(shell)
+        fired = []
+
+        def _fire(name):
+            fired.append(name)
+            if len(fired) == 3:
+                sched.shutdown()
+
+        sched.idle(Mock(spec_set=[]))
+        second = sched.after(0, _fire, "second")
+        first = sched.after(0, _fire, "first").enable(instant=True)
+        second.enable(instant=True)
+        disabled = sched.after(0, _fire, "disabled").enable(instant=True)
+        disabled.disable()
+        repeated = sched.every(0, _fire, "repeated").enable()
+        sched.run()
+        self.assertEqual(["first", "second", "repeated"], fired)
+        self.assertTrue(repeated)
+        self.assertFalse(first)
+
+        summary = sched.stats.summary()
+        self.assertGreaterEqual(summary["iterations"], 3)
+        callback = summary["callbacks"][SchedulerStats.name(_fire)]
+        self.assertEqual(3, callback["duration"]["count"])
+        self.assertEqual(3, callback["lateness"]["count"])
+
+    def test_slack(self):
+        """ Test that tasks with slack share a wake up. """
+
+        sched = Scheduler(self.shell_mock())
+        clock = [1000.0]
+        sched.time_func = lambda: clock[0]
+        idles, fired = [], []
+
+        def _idle(duration):
+            idles.append(duration)
+            clock[0] += duration
+
+        def _fire(name):
+            fired.append((name, clock[0]))
+            if len(fired) == 3:
+                sched.shutdown()
+
+        sched.idle(_idle)
+        tasks = []
+        for name, delay, slack in (("a", 0.5, 0.3), ("b", 0.6, 0.3),
+                                   ("c", 0.7, 0)):
+            task = sched.after(delay, _fire, name)
+            task.time_func = sched.time_func
+            tasks.append(task.tolerate(slack).enable())
+        sched.run()
+        self.assertEqual(1, len(idles))
+        self.assertAlmostEqual(0.7, idles[0])
+        self.assertEqual(["a", "b", "c"], [name for name, _ in fired])
+        self.assertEqual(2, sched.stats.saved_wakeups)
+
+    def test_reactor(self):
+        """ Test dispatching of ready files and wakeups. """
+
+        shell = self.shell_mock()
+        sched = Scheduler(shell)
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        received = []
+
+        def _on_readable(_events):
+            received.append(os.read(read_fd, 1))
+            sched.shutdown()
+
+        sched.register(read_fd, _on_readable)
+        os.write(write_fd, b"a")
+        sched.run()
+        self.assertEqual([b"a"], received)
+
+        sched.unregister(read_fd)
+        sched.shutdown_request.clear()
+        threading.Timer(0.05, sched.shutdown).start()
+        os.write(write_fd, b"b")
+        sched.run()
+        self.assertEqual([b"a"], received)
+
+    def test_watchdog(self):
+        """ Test detection of blocking callbacks and feeding. """
+
+        sched = Scheduler(self.shell_mock(watchdog=0.05))
+        fed = threading.Event()
+        sched.watchdog.add_feeder(fed.set)
+
+        def _block():
+            time.sleep(0.2)
+            fed.clear()
+            sched.after(0.1, sched.shutdown).enable()
+
+        sched.after(0, _block).enable()
+        with self.assertLogs(sched.watchdog.log) as logs:
+            sched.run()
+        self.assertEqual(1, len(logs.records))
+        self.assertIn("_block", logs.output[0])
+        self.assertIn("time.sleep", logs.output[0])
+        self.assertTrue(fed.is_set())
+        self.assertTrue(sched.watchdog.stopped.is_set())
+
+    def test_call_soon(self):
+        """ Test passing calls from other threads. """
+
+        shell = self.shell_mock()
+        sched = Scheduler(shell)
+        threads = []
+
+        def _call():
+            threads.append(threading.current_thread())
+            sched.shutdown()
+
+        threading.Thread(target=sched.call_soon, args=(_call,)).start()
+        sched.run()
+        self.assertEqual([threading.current_thread()], threads)
+
+
+class AsyncioSchedulerTest(unittest.TestCase):
+    """ Test AsyncioScheduler class. """
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.sched = AsyncioScheduler(SchedulerTest.shell_mock(), self.loop)
+
+    def test_run(self):
+        """ Test task execution order on the loop. """
+
+        sched, fired = self.sched, []
+
+        def _fire(name):
+            fired.append(name)
+            if len(fired) == 3:
+                sched.shutdown()
+
+        second = sched.after(0.02, _fire, "second").enable()
+        first = sched.after(0.01, _fire, "first").enable()
+        disabled = sched.after(0, _fire, "disabled").enable()
+        disabled.disable()
+        repeated = sched.every(0.05, _fire, "repeated").enable()
+        sched.run()
+        self.assertEqual(["first", "second", "repeated"], fired)
+        self.assertTrue(repeated)
+        self.assertIsNotNone(repeated.entry)
+        self.assertFalse(first)
+        self.assertFalse(second)
+        self.assertRaises(NotImplementedError, sched.idle, Mock())
+
+    def test_reactor(self):
+        """ Test dispatching of ready files. """
+
+        sched = self.sched
+        read_fd, write_fd = os.pipe()
+        self.addCleanup(os.close, read_fd)
+        self.addCleanup(os.close, write_fd)
+        received = []
+
+        def _on_readable(_events):
+            received.append(os.read(read_fd, 1))
+            sched.unregister(read_fd)
+            sched.shutdown()
+
+        sched.register(read_fd, _on_readable)
+        os.write(write_fd, b"a")
+        sched.run()
+        self.assertEqual([b"a"], received)
+
+
+class HistogramTest(unittest.TestCase):
+    """ Test Histogram class. """
+
+    def test_buckets(self):
+        """ Test bucket assignment and summary. """
+
+        histogram = Histogram(base=1, size=4)
+        self.assertEqual([1, 2, 4], histogram.bounds())
+        [histogram.add(v) for v in (0, 0.5, 1.5, 3, 5, 100)]
+        summary = histogram.summary()
+        self.assertEqual([2, 1, 1, 2], summary["buckets"])
+        self.assertEqual(6, summary["count"])
+        self.assertEqual(100, summary["max"])
+        self.assertAlmostEqual(110 / 6, summary["mean"])
 
 
 class TaskTest(unittest.TestCase):
@@ -72,7 +278,7 @@ class TaskTest(unittest.TestCase):
     def test_time(self):
         """ Test time handling. """
 
-        sched = NonCallableMock(spec_set=["tasks_changed"])
+        sched = NonCallableMock(spec_set=["schedule", "unschedule"])
         args = (1, 2)
         kwargs = {"3": True, "4": False}
         delay1, delay2 = 1, 2
@@ -96,7 +302,7 @@ class TaskTest(unittest.TestCase):
     def test_fire(self):
         """ Test task firing. """
 
-        sched = NonCallableMock(spec_set=["tasks_changed"])
+        sched = NonCallableMock(spec_set=["schedule", "unschedule"])
         args = (1, 2)
         kwargs = {"3": True, "4": False}
         delay = 1
@@ -122,10 +328,31 @@ class TaskTest(unittest.TestCase):
         self.assertTrue(task)
         self.assertEqual(delay+times[2], task.at)
 
+    def test_fixed_rate(self):
+        """ Test fixed rate scheduling and catch up policies. """
+
+        sched = NonCallableMock(spec_set=["schedule", "unschedule"])
+        cb = Mock(spec_set=[])
+        task = Task(sched=sched, delay=10, repeat=True, cb=cb,
+                    args=(), kwargs={})
+        self.assertRaises(ValueError, task.fixed_rate, "unknown")
+        for policy, expected in ((Task.SKIP, [10, 20, 60, 70]),
+                                 (Task.COALESCE, [10, 20, 55, 60]),
+                                 (Task.BURST, [10, 20, 30, 40])):
+            times = iter([0, 11, 55, 56])
+            task.time_func = lambda times=times: next(times)
+            self.assertIs(task, task.fixed_rate(policy))
+            task.enable()
+            ats = [task.at]
+            for _ in range(3):
+                task.fire()
+                ats.append(task.at)
+            self.assertEqual(expected, ats, policy)
+
     def test_aus(self):
         """ Test __lt__ and __bool__. """
 
-        sched = NonCallableMock(spec_set=["tasks_changed"])
+        sched = NonCallableMock(spec_set=["schedule", "unschedule"])
         args = (1, 2)
         kwargs = {"3": True, "4": False}
         delay1, delay2 = 0.003, 0.010
@@ -0,0 +1,131 @@
+""" Test task queues. """
+
+import unittest
+from unittest.mock import Mock, NonCallableMock
+from mauzr.taskqueue import TaskHeap, TaskWheel
+
+__author__ = "Alexander Sowitzki"
+
+class TaskHeapTest(unittest.TestCase):
+    """ Test TaskHeap class. """
+
+    @staticmethod
+    def task_mock(at):
+        """ Create a task mock due at the given time. """
+
+        task = NonCallableMock(spec_set=["at", "ref", "entry", "slack"],
+                               at=at, entry=None, slack=0)
+        task.ref = Mock(spec_set=[], return_value=task)
+        return task
+
+    def test_order(self):
+        """ Test that tasks are popped by execution time. """
+
+        queue = TaskHeap()
+        tasks = [self.task_mock(at) for at in (5, 1, 3, 2, 4)]
+        [queue.push(t) for t in tasks]
+        self.assertEqual([1, 2, 3, 4, 5],
+                         [queue.pop().at for _ in range(len(tasks))])
+        self.assertIsNone(queue.peek())
+        self.assertIsNone(queue.pop())
+
+    def test_lazy_invalidation(self):
+        """ Test rescheduling and discarding of tasks. """
+
+        queue = TaskHeap(compact_min=2)
+        first, second = self.task_mock(1), self.task_mock(2)
+        queue.push(first)
+        queue.push(second)
+        first.at = 3
+        queue.push(first)
+        self.assertEqual(1, queue.stale)
+        self.assertIs(second, queue.peek())
+        queue.discard(second)
+        self.assertIsNone(second.entry)
+        self.assertIs(first, queue.pop())
+        self.assertIsNone(queue.peek())
+        self.assertEqual(0, queue.stale)
+
+    def test_next_deadline(self):
+        """ Test that the wake up respects the slack of all tasks. """
+
+        queue = TaskHeap()
+        self.assertIsNone(queue.next_deadline())
+        tasks = [self.task_mock(at) for at in (1, 2, 3, 10)]
+        for task, slack in zip(tasks, (5, 3, 0.5, 0)):
+            task.slack = slack
+            queue.push(task)
+        self.assertEqual(3.5, queue.next_deadline())
+        queue.discard(tasks[2])
+        self.assertEqual(5, queue.next_deadline())
+        self.assertEqual(1, queue.next_at())
+
+    def test_compact(self):
+        """ Test compaction of stale entries. """
+
+        queue = TaskHeap(compact_min=4)
+        task = self.task_mock(1)
+        for at in range(10):
+            task.at = at
+            queue.push(task)
+        self.assertLess(len(queue), 10)
+        self.assertIs(task, queue.pop())
+        self.assertIsNone(queue.peek())
+
+
+class TaskWheelTest(unittest.TestCase):
+    """ Test TaskWheel class. """
+
+    def test_order(self):
+        """ Test that tasks expire in order across levels. """
+
+        queue = TaskWheel(tick=1, bits=2, depth=3, time_func=lambda: 0)
+        ats = [70.5, 1.5, 3.5, 17.25, 17.5, 1000]
+        tasks = [TaskHeapTest.task_mock(at) for at in ats]
+        [queue.push(t) for t in tasks]
+        self.assertEqual(len(ats), len(queue))
+        fired, now = [], 0
+        while now < 2000:
+            at = queue.next_at()
+            self.assertIsNotNone(at)
+            self.assertGreaterEqual(at, now)
+            now = at
+            task = queue.pop(now)
+            if task is not None:
+                self.assertLessEqual(task.at, now)
+                fired.append(task.at)
+                if len(fired) == len(ats):
+                    break
+        self.assertEqual(sorted(ats), fired)
+        self.assertIsNone(queue.next_at())
+        self.assertEqual(0, len(queue))
+
+    def test_rearm(self):
+        """ Test re-arming and discarding of tasks. """
+
+        queue = TaskWheel(tick=1, bits=2, depth=3, time_func=lambda: 0)
+        task, other = TaskHeapTest.task_mock(2), TaskHeapTest.task_mock(30)
+        queue.push(other)
+        for at in range(2, 40, 3):
+            task.at = at
+            queue.push(task)
+        self.assertEqual(2, len(queue))
+        self.assertIs(other, queue.pop(31))
+        self.assertIsNone(queue.pop(31))
+        other.at = 50
+        queue.push(other)
+        queue.discard(other)
+        self.assertEqual(1, len(queue))
+        self.assertIs(task, queue.pop(38))
+        self.assertIsNone(queue.pop(100))
+
+    def test_slack(self):
+        """ Test that tasks with slack expire until their deadline. """
+
+        queue = TaskWheel(tick=1, bits=2, depth=3, time_func=lambda: 0)
+        task = TaskHeapTest.task_mock(5)
+        task.slack = 10
+        queue.push(task)
+        self.assertLessEqual(queue.next_deadline(), 15)
+        self.assertIsNone(queue.pop(14))
+        self.assertIs(task, queue.pop(15))